@@ -1,50 +1,135 @@
 import argparse
+import asyncio
 import json
 import os
+import ssl
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
 
+import aiohttp
 import ccxt
-import pytz
-import requests
+import ccxt.pro as ccxtpro
+import numpy as np
+import orjson
 from dotenv import load_dotenv
 
-from utils import client_order_id, now_ms, rsi, sleep_s
+from utils import (
+    client_order_id,
+    now_ms,
+    round_step,
+    rsi_from_avg,
+    rsi_seed,
+    rsi_step,
+)
+
+TG_MAX_LEN = 4096
+_TG_QUEUE: "asyncio.Queue[str]" = asyncio.Queue()
 
 
 def send_telegram(msg: str):
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    """Queue a message; telegram_worker sends it so callers never wait on Telegram."""
+    if not os.getenv("TELEGRAM_BOT_TOKEN") or not os.getenv("TELEGRAM_CHAT_ID"):
+        return
+    _TG_QUEUE.put_nowait(msg)
+
+
+async def telegram_worker():
+    """Send queued messages over one keep-alive session, joining any backlog into one message."""
+    token, chat_id = os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
     if not token or not chat_id:
         return
-    try:
-        requests.get(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            params={"chat_id": chat_id, "text": msg},
-        )
-    except Exception:
-        pass
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+        try:
+            # open the TLS connection before the first real message needs it
+            async with session.head("https://api.telegram.org"):
+                pass
+        except Exception:
+            pass
+        pending = None
+        while True:
+            text = pending or await _TG_QUEUE.get()
+            pending = None
+            if len(text) > TG_MAX_LEN:
+                # Telegram rejects the whole message, so send it in pieces
+                text, pending = text[:TG_MAX_LEN], text[TG_MAX_LEN:]
+            while pending is None and not _TG_QUEUE.empty():
+                msg = _TG_QUEUE.get_nowait()
+                if len(text) + len(msg) + 2 > TG_MAX_LEN:
+                    pending = msg
+                    break
+                text += "\n\n" + msg
+            try:
+                async with session.get(url, params={"chat_id": chat_id, "text": text}) as resp:
+                    if resp.status != 200:
+                        print(f"[ERR] TELEGRAM: HTTP {resp.status} {await resp.text()}")
+            except Exception as e:
+                print(f"[ERR] TELEGRAM: {e}")
 
 
 STATE_DIR = "STATE"
-P_L_FILE = os.path.join(STATE_DIR, "profit_log.json")
+P_L_FILE = os.path.join(STATE_DIR, "profit_log.jsonl")
 
 
-@dataclass
+@dataclass(slots=True)
 class SymbolState:
     avg_entry: float = 0.0
     total_base: float = 0.0
-    open_buy_orders: List[str] = field(default_factory=list)
-    open_sell_orders: List[str] = field(default_factory=list)
+    open_buy_orders: Set[str] = field(default_factory=set)
+    # cid -> (price, amount), so a take-profit level is not placed twice
+    open_sell_orders: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    # position size the resting take-profit ladder was placed for
+    tp_ladder_base: float = 0.0
     anchor_price: Optional[float] = None
     last_signal_ts: int = 0
+    # ms, set when the first tracked order is placed and cleared once none are open
+    reconcile_since: int = 0
+    rsi_avg_gain: float = 0.0
+    rsi_avg_loss: float = 0.0
+    rsi_last_close: float = 0.0
+    rsi_last_ts: int = 0
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class SymbolConfig:
+    symbol: str
+    timeframe: str
+    entry_rsi_lt: float
+    usd_per_entry: float
+    dca_steps: int
+    dca_step_pct: float
+    max_position_usd: float
+    take_profits: np.ndarray
+    tp_allocation: np.ndarray
+    stop_close_below: float
+    dca_levels: np.ndarray
+    min_notional_usd: float = 10.0
+
+
+def _coerce(sym_cfg: Dict) -> Dict:
+    return {
+        "symbol": sym_cfg["symbol"],
+        "timeframe": sym_cfg["timeframe"],
+        "entry_rsi_lt": float(sym_cfg["entry_rsi_lt"]),
+        "usd_per_entry": float(sym_cfg["usd_per_entry"]),
+        "dca_steps": int(sym_cfg["dca_steps"]),
+        "dca_step_pct": float(sym_cfg["dca_step_pct"]),
+        "max_position_usd": float(sym_cfg["max_position_usd"]),
+        "take_profits": np.asarray(sym_cfg["take_profits"], dtype=np.float64),
+        "tp_allocation": np.asarray(sym_cfg["tp_allocation"], dtype=np.float64),
+        "stop_close_below": float(sym_cfg["stop_close_below"]),
+        "dca_levels": 1.0
+        - np.arange(int(sym_cfg["dca_steps"])) * float(sym_cfg["dca_step_pct"]) / 100.0,
+        "min_notional_usd": float(sym_cfg.get("min_notional_usd", 10.0)),
+    }
 
 
 def ensure_state_dir():
-    if not os.path.exists(STATE_DIR):
-        os.makedirs(STATE_DIR, exist_ok=True)
+    os.makedirs(STATE_DIR, exist_ok=True)
 
 
 def state_path(sym: str) -> str:
@@ -52,37 +137,243 @@ def state_path(sym: str) -> str:
     return os.path.join(STATE_DIR, f"{safe}.json")
 
 
+_state_cache: Dict[str, SymbolState] = {}
+_state_written: Dict[str, bytes] = {}
+_state_dirty: Set[str] = set()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
 def load_state(sym: str) -> SymbolState:
-    p = state_path(sym)
-    if not os.path.exists(p):
-        return SymbolState()
-    with open(p, "r") as f:
-        data = json.load(f)
-    return SymbolState(**data)
+    st = _state_cache.get(sym)
+    if st is not None:
+        return st
+    try:
+        with open(state_path(sym), "rb") as f:
+            data = orjson.loads(f.read())
+    except FileNotFoundError:
+        st = SymbolState()
+    else:
+        data["open_buy_orders"] = set(data.pop("open_buy_orders", []))
+        sells = data.pop("open_sell_orders", {})
+        if not isinstance(sells, dict):
+            sells = dict.fromkeys(sells, (0.0, 0.0))
+        data["open_sell_orders"] = {cid: tuple(v) for cid, v in sells.items()}
+        # older files: take any resting TPs as sized for the current position
+        data.setdefault("tp_ladder_base", data.get("total_base", 0.0))
+        st = SymbolState(**data)
+    _state_cache[sym] = st
+    return st
 
 
 def save_state(sym: str, st: SymbolState):
-    with open(state_path(sym), "w") as f:
-        json.dump(st.__dict__, f, indent=2)
+    """Update the cached state; the file is written by the next flush_state()."""
+    _state_cache[sym] = st
+    _state_dirty.add(sym)
+
+
+def flush_state():
+    """Write every dirty state, skipping the ones whose bytes did not change."""
+    while _state_dirty:
+        sym = _state_dirty.pop()
+        data = orjson.dumps(_state_cache[sym], default=sorted)
+        if _state_written.get(sym) == data:
+            continue
+        _write_atomic(state_path(sym), data)
+        _state_written[sym] = data
+
+
+LOCAL_TZ = "Africa/Lagos"
+PL_ARCHIVE_FILE = os.path.join(STATE_DIR, "profit_log.archive.jsonl")
+PL_META_FILE = os.path.join(STATE_DIR, "profit_log.meta.json")
+PL_KEEP_DAYS = 30
+
+
+def _date_key(ts: float, tz_name: str = LOCAL_TZ) -> str:
+    return datetime.fromtimestamp(ts, ZoneInfo(tz_name)).strftime("%Y-%m-%d")
+
+
+def _parse_trades(lines):
+    for line in lines:
+        try:
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
 
 
-def load_pl():
-    if not os.path.exists(P_L_FILE):
-        return {"trades": [], "last_daily_summary_date": ""}
-    with open(P_L_FILE, "r") as f:
-        return json.load(f)
+def iter_trades(path: str = P_L_FILE):
+    try:
+        with open(path, "rb") as f:
+            yield from _parse_trades(f)
+    except FileNotFoundError:
+        return
+
+
+def iter_trades_reversed(path: str = P_L_FILE, block: int = 1 << 16):
+    """Yield trades newest first, reading the file backwards one block at a time."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        head = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + head).split(b"\n")
+            # the first piece may be the tail of a line that starts in the next block
+            head = lines.pop(0)
+            yield from _parse_trades(line for line in reversed(lines) if line)
+        if head:
+            yield from _parse_trades([head])
+
+
+def _append_lines(path: str, lines: List[bytes]):
+    with open(path, "ab") as f:
+        f.write(b"".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_pl_meta() -> Dict:
+    try:
+        with open(PL_META_FILE, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return {"last_daily_summary_date": "", "today_date": "", "today_realized_usd": 0.0}
+
+
+def save_pl_meta(meta: Dict):
+    _write_atomic(PL_META_FILE, orjson.dumps(meta))
+
+
+def _add_realized(meta: Dict, trade: Dict):
+    """Keep a running realized P&L for the current local day in the meta file."""
+    day = _date_key(trade["ts"])
+    if meta.get("today_date") != day:
+        meta["today_date"] = day
+        meta["today_realized_usd"] = 0.0
+    meta["today_realized_usd"] += float(trade.get("realized_usd", 0))
+
+
+def append_trade(trade: Dict):
+    _append_lines(P_L_FILE, [orjson.dumps(trade) + b"\n"])
+    meta = load_pl_meta()
+    _add_realized(meta, trade)
+    save_pl_meta(meta)
+
+
+_PL_LOCK = asyncio.Lock()
+
+
+async def record_trade(trade: Dict):
+    """Run append_trade off the event loop, one trade at a time so meta updates don't race."""
+    async with _PL_LOCK:
+        await asyncio.to_thread(append_trade, trade)
+
+
+def migrate_pl():
+    """
+    Convert the old profit_log.json (and its archive) into the JSONL files.
+    The JSONL is replaced atomically, and the migrated lines are not appended
+    again if the file already ends with them, so a crash before the old file
+    is removed does not duplicate trades on rerun.
+    """
+    for new in (P_L_FILE, PL_ARCHIVE_FILE):
+        old = os.path.splitext(new)[0] + ".json"
+        try:
+            with open(old, "rb") as f:
+                pl = orjson.loads(f.read())
+        except FileNotFoundError:
+            continue
+        trades = pl.get("trades", [])
+        for bucket in pl.get("trades_by_date", {}).values():
+            trades.extend(bucket)
+        trades.sort(key=lambda t: t["ts"])
+        try:
+            with open(new, "rb") as f:
+                existing = f.read()
+        except FileNotFoundError:
+            existing = b""
+        migrated = b"".join(orjson.dumps(t) + b"\n" for t in trades)
+        if not existing.endswith(migrated):
+            _write_atomic(new, existing + migrated)
+        if new == P_L_FILE:
+            # recounted from the file, so a rerun gives the same total
+            today = _date_key(time.time())
+            meta = load_pl_meta()
+            meta["last_daily_summary_date"] = pl.get("last_daily_summary_date", "")
+            meta["today_date"], meta["today_realized_usd"] = today, 0.0
+            for t in iter_trades_reversed():
+                if _date_key(t["ts"]) != today:
+                    break
+                _add_realized(meta, t)
+            save_pl_meta(meta)
+        os.remove(old)
+
+
+def rotate_pl(keep_days: int = PL_KEEP_DAYS):
+    """Move trades older than `keep_days` into the archive file."""
+    cutoff = _date_key(time.time() - keep_days * 86400)
+    old, recent = [], []
+    for t in iter_trades():
+        (old if _date_key(t["ts"]) < cutoff else recent).append(orjson.dumps(t) + b"\n")
+    if not old:
+        return
+    _append_lines(PL_ARCHIVE_FILE, old)
+    _write_atomic(P_L_FILE, b"".join(recent))
+
 
+class MarketMeta(NamedTuple):
+    amount_step: float
+    price_step: float
+    min_amount: float
+    min_cost: float
 
-def save_pl(pl):
-    with open(P_L_FILE, "w") as f:
-        json.dump(pl, f, indent=2)
 
+_MARKET_META: Dict[str, MarketMeta] = {}
 
-def make_exchange(dry_run: bool):
+
+def _precision_step(exchange, precision) -> float:
+    if precision is None:
+        return 0.0
+    if exchange.precisionMode == ccxt.DECIMAL_PLACES:
+        return 10.0**-precision
+    return float(precision)
+
+
+def _cache_market_meta(exchange):
+    for sym, m in exchange.markets.items():
+        precision = m.get("precision") or {}
+        limits = m.get("limits") or {}
+        _MARKET_META[sym] = MarketMeta(
+            _precision_step(exchange, precision.get("amount")),
+            _precision_step(exchange, precision.get("price")),
+            float((limits.get("amount") or {}).get("min") or 0.0),
+            float((limits.get("cost") or {}).get("min") or 0.0),
+        )
+
+
+def market_limits(symbol: str) -> MarketMeta:
+    return _MARKET_META.get(symbol) or MarketMeta(0.0, 0.0, 0.0, 0.0)
+
+
+HTTP_POOL_SIZE = 10
+HTTP_KEEPALIVE_S = 90
+
+
+async def make_exchange(dry_run: bool):
     load_dotenv()
     api_key = os.getenv("GATEIO_API_KEY", "")
     api_secret = os.getenv("GATEIO_API_SECRET", "")
-    exchange = ccxt.gateio(
+    exchange = ccxtpro.gateio(
         {
             "apiKey": api_key,
             "secret": api_secret,
@@ -92,56 +383,154 @@ def make_exchange(dry_run: bool):
     )
     if not dry_run and (not api_key or not api_secret):
         raise RuntimeError("Live mode requires GATEIO_API_KEY and GATEIO_API_SECRET in .env")
-    exchange.load_markets()
+    # a pooled keep-alive session instead of ccxt's default; aiohttp already sets TCP_NODELAY
+    exchange.tcp_connector = aiohttp.TCPConnector(
+        ssl=ssl.create_default_context(cafile=exchange.cafile),
+        limit=HTTP_POOL_SIZE,
+        keepalive_timeout=HTTP_KEEPALIVE_S,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
+    exchange.session = aiohttp.ClientSession(
+        connector=exchange.tcp_connector, trust_env=exchange.aiohttp_trust_env
+    )
+    # load_markets is the first request, so it also opens the pooled connection
+    try:
+        await exchange.load_markets()
+    except Exception:
+        await exchange.close()
+        raise
+    _cache_market_meta(exchange)
     return exchange
 
 
-def fetch_rsi(exchange, symbol: str, timeframe: str, lookback: int, period: int) -> float:
-    ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=period + 50)
-    closes = [c[4] for c in ohlcv]
-    return rsi(closes, period)
+_RSI_MEMO: Dict[str, tuple] = {}
+TAIL_LIMIT = 5
 
 
-def get_price(exchange, symbol: str) -> float:
-    ticker = exchange.fetch_ticker(symbol)
-    return ticker["last"] or ticker["close"]
+async def fetch_rsi(
+    exchange, symbol: str, timeframe: str, lookback: int, period: int, ohlcv=None
+) -> float:
+    """
+    Advance Wilder's RSI averages by one step per newly closed candle instead
+    of recomputing them from the whole history. The averages live on the
+    symbol's state so they survive restarts. `ohlcv` is the streamed tail of
+    candles; without it the tail is fetched over REST. An unseeded state, or a
+    gap wider than the tail, seeds the averages from a full fetch. The
+    still-open last candle only feeds a provisional value and is never folded in.
+    """
+    st = load_state(symbol)
+    seeded = st.rsi_last_ts > 0
+    streamed = ohlcv is not None
+    if seeded and not streamed:
+        ohlcv = await exchange.fetch_ohlcv(
+            symbol, timeframe=timeframe, since=st.rsi_last_ts, limit=TAIL_LIMIT
+        )
+        if len(ohlcv) >= TAIL_LIMIT:
+            seeded = False
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    if seeded and (not ohlcv or ohlcv[0][0] > st.rsi_last_ts + tf_ms):
+        seeded = False
+    if not seeded:
+        history = await exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=period + 50)
+        closed = np.asarray([c[4] for c in history[:-1]], dtype=np.float64)
+        avg_gain, avg_loss = rsi_seed(closed, period)
+        if np.isnan(avg_gain):
+            return float("nan")
+        st.rsi_avg_gain, st.rsi_avg_loss = float(avg_gain), float(avg_loss)
+        st.rsi_last_close, st.rsi_last_ts = float(closed[-1]), int(history[-2][0])
+        # a REST tail that forced the reseed is stale; only a streamed one is newer
+        ohlcv = ohlcv if streamed and ohlcv else history
+
+    for c in ohlcv[:-1]:
+        if c[0] <= st.rsi_last_ts:
+            continue
+        st.rsi_avg_gain, st.rsi_avg_loss = rsi_step(
+            st.rsi_avg_gain, st.rsi_avg_loss, c[4] - st.rsi_last_close, period
+        )
+        st.rsi_last_close = float(c[4])
+        st.rsi_last_ts = int(c[0])
 
+    key = (int(ohlcv[-1][0]), float(ohlcv[-1][4]), st.rsi_last_ts)
+    memo = _RSI_MEMO.get(symbol)
+    if memo and memo[0] == key:
+        return memo[1]
+    avg_gain, avg_loss = st.rsi_avg_gain, st.rsi_avg_loss
+    if ohlcv[-1][0] > st.rsi_last_ts:
+        avg_gain, avg_loss = rsi_step(avg_gain, avg_loss, ohlcv[-1][4] - st.rsi_last_close, period)
+    _RSI_MEMO[symbol] = (key, rsi_from_avg(avg_gain, avg_loss))
+    return _RSI_MEMO[symbol][1]
 
-def place_limit_buy(exchange, symbol: str, amount: float, price: float, dry_run: bool):
-    cid = client_order_id("buy")
-    if dry_run:
-        print(f"[DRY] BUY {symbol} {amount} @ {price}")
-        return cid
-    try:
-        _ = exchange.create_order(symbol, "limit", "buy", amount, price, {"clientOrderId": cid})
-        print(f"[LIVE] BUY placed: {amount} @ {price}")
-        return cid
-    except Exception as e:
-        print(f"[ERR] BUY: {e}")
-        return None
 
+def _price_from_ticker(ticker: Dict) -> float:
+    price = ticker.get("last") or ticker.get("close")
+    if not price and ticker.get("ask") and ticker.get("bid"):
+        price = (ticker["ask"] + ticker["bid"]) / 2
+    return price
 
-def place_limit_sell(exchange, symbol: str, amount: float, price: float, dry_run: bool):
-    cid = client_order_id("sell")
+
+async def get_price(exchange, symbol: str) -> float:
+    return _price_from_ticker(await exchange.fetch_ticker(symbol))
+
+
+BATCH_LIMIT = 10
+
+
+async def place_limit_orders(
+    exchange, symbol: str, side: str, amounts: List[float], prices: List[float], dry_run: bool
+) -> List[Optional[str]]:
+    """
+    Place a ladder of limit orders through Gate's batch endpoint, BATCH_LIMIT
+    orders per request. Returns the client order id of each order, or None for
+    the ones that were rejected.
+    """
+    cids = [client_order_id(side) for _ in amounts]
     if dry_run:
-        print(f"[DRY] SELL {symbol} {amount} @ {price}")
-        return cid
-    try:
-        _ = exchange.create_order(symbol, "limit", "sell", amount, price, {"clientOrderId": cid})
-        print(f"[LIVE] SELL placed: {amount} @ {price}")
-        return cid
-    except Exception as e:
-        print(f"[ERR] SELL: {e}")
-        return None
+        for amount, price in zip(amounts, prices):
+            print(f"[DRY] {side.upper()} {symbol} {amount} @ {price}")
+        return cids
+    placed: List[Optional[str]] = []
+    for i in range(0, len(cids), BATCH_LIMIT):
+        batch = [
+            {
+                "symbol": symbol,
+                "type": "limit",
+                "side": side,
+                "amount": amount,
+                "price": price,
+                "params": {"clientOrderId": cid},
+            }
+            for cid, amount, price in zip(
+                cids[i : i + BATCH_LIMIT],
+                amounts[i : i + BATCH_LIMIT],
+                prices[i : i + BATCH_LIMIT],
+            )
+        ]
+        try:
+            orders = await exchange.create_orders(batch)
+        except Exception as e:
+            print(f"[ERR] {side.upper()} batch: {e}")
+            placed.extend([None] * len(batch))
+            continue
+        for req, o in zip(batch, orders):
+            if o.get("status") == "rejected":
+                print(f"[ERR] {side.upper()}: {o.get('info', {}).get('message')}")
+                placed.append(None)
+            else:
+                print(f"[LIVE] {side.upper()} placed: {req['amount']} @ {req['price']}")
+                placed.append(req["params"]["clientOrderId"])
+    return placed
 
 
-def place_market_sell(exchange, symbol: str, amount: float, dry_run: bool):
+async def place_market_sell(exchange, symbol: str, amount: float, dry_run: bool):
     cid = client_order_id("mksell")
     if dry_run:
         print(f"[DRY] MARKET SELL {symbol} {amount}")
         return cid
     try:
-        _ = exchange.create_order(symbol, "market", "sell", amount, None, {"clientOrderId": cid})
+        _ = await exchange.create_order(
+            symbol, "market", "sell", amount, None, {"clientOrderId": cid}
+        )
         print(f"[LIVE] MARKET SELL placed: {amount}")
         return cid
     except Exception as e:
@@ -149,36 +538,114 @@ def place_market_sell(exchange, symbol: str, amount: float, dry_run: bool):
         return None
 
 
-def amount_from_usd(exchange, symbol: str, usd: float, price: float) -> float:
-    amt = usd / price
-    return float(exchange.amount_to_precision(symbol, amt))
+async def cancel_orders(exchange, symbol: str, cids: List[str], dry_run: bool) -> Dict[str, Dict]:
+    """
+    Cancel orders by client order id. Returns the cancelled ids mapped to the
+    order the exchange reported, so fills made before the cancel can be booked.
+    """
+    if dry_run:
+        for cid in cids:
+            print(f"[DRY] CANCEL {symbol} {cid}")
+        return dict.fromkeys(cids, {})
+    # Gate accepts its "t-" prefixed client id in place of the order id
+    results = await asyncio.gather(
+        *[exchange.cancel_order(f"t-{cid}", symbol) for cid in cids], return_exceptions=True
+    )
+    cancelled = {}
+    for cid, res in zip(cids, results):
+        if isinstance(res, Exception):
+            print(f"[ERR] CANCEL {cid}: {res}")
+        else:
+            cancelled[cid] = res or {}
+    return cancelled
+
+
+def can_trade_size(symbol: str, amounts: np.ndarray, prices, min_notional: float) -> np.ndarray:
+    meta = market_limits(symbol)
+    return (amounts >= meta.min_amount) & (amounts * prices >= max(min_notional, meta.min_cost))
+
+
+def round_amounts(exchange, symbol: str, amounts: np.ndarray) -> np.ndarray:
+    step = market_limits(symbol).amount_step
+    if not step:
+        return np.array([float(exchange.amount_to_precision(symbol, a)) for a in amounts])
+    return round_step(amounts, step)
+
 
+def round_prices(symbol: str, prices: np.ndarray) -> np.ndarray:
+    step = market_limits(symbol).price_step
+    return round_step(prices, step) if step else prices
 
-def reconcile_fills(exchange, symbol: str, st: SymbolState, quote_ccy: str, dry_run: bool):
+
+RECONCILE_SLACK_MS = 60_000
+RECONCILE_PAGE = 50
+
+
+async def _fetch_closed_since(exchange, symbol: str, since: Optional[int]) -> List[Dict]:
+    """Page through fetch_closed_orders from `since` until a short page comes back."""
+    orders: Dict[str, Dict] = {}
+    while True:
+        page = await exchange.fetch_closed_orders(symbol, since=since, limit=RECONCILE_PAGE)
+        # the next page starts at the last timestamp, which a whole batch of
+        # orders can share, so the overlap is dropped by order id
+        fresh = [o for o in page if o.get("id") not in orders]
+        orders.update((o.get("id"), o) for o in fresh)
+        if len(page) < RECONCILE_PAGE or not fresh:
+            return list(orders.values())
+        since = max(int(o.get("timestamp") or 0) for o in page)
+
+
+async def _book_tp_fill(symbol: str, st: SymbolState, filled: float, price: float):
+    """Realize a take-profit fill, full or partial, against the average entry."""
+    realized = filled * price - filled * st.avg_entry
+    st.total_base = max(0.0, st.total_base - filled)
+    await record_trade(
+        {
+            "ts": int(time.time()),
+            "symbol": symbol,
+            "side": "tp_exit",
+            "filled": filled,
+            "price": price,
+            "realized_usd": realized,
+        }
+    )
+    send_telegram(
+        f"🎉 TAKE PROFIT FILLED\n{symbol}\nSold: {filled}\n@ {price}\nPnL: {realized:.2f} USDT"
+    )
+
+
+async def reconcile_fills(exchange, symbol: str, st: SymbolState, quote_ccy: str, dry_run: bool):
     """
     Reconcile only FILLED buy/sell orders using fetch_closed_orders(),
     because fetch_orders() is NOT supported on Gate.io.
     Ensures TP orders only appear AFTER actual fills.
+    Only orders closed since the oldest tracked order was placed are fetched,
+    and nothing is fetched while no orders are tracked.
+    Returns True when the state was modified.
     """
-    if dry_run:
-        return
+    if dry_run or not (st.open_buy_orders or st.open_sell_orders):
+        return False
 
     try:
-        closed_orders = exchange.fetch_closed_orders(symbol, limit=50)
+        closed_orders = await _fetch_closed_since(exchange, symbol, st.reconcile_since or None)
     except Exception as e:
         print(f"[{symbol}] reconcile error: {e}")
-        return
+        return False
 
-    pl = load_pl()
     changed = False
-
     for o in closed_orders:
-        cid = o.get("clientOrderId") or ""
+        # Gate stores the id with a "t-" prefix
+        cid = (o.get("clientOrderId") or "").removeprefix("t-")
         side = o.get("side", "")
         filled = float(o.get("filled") or 0)
         price = float(o.get("average") or o.get("price") or 0)
 
         if filled <= 0 or price <= 0:
+            # canceled or expired without a fill: stop tracking it so the window can move on
+            if cid in st.open_buy_orders or cid in st.open_sell_orders:
+                st.open_buy_orders.discard(cid)
+                st.open_sell_orders.pop(cid, None)
+                changed = True
             continue
         # === BUY FILLED ===
         if side == "buy" and cid in st.open_buy_orders:
@@ -188,99 +655,82 @@ def reconcile_fills(exchange, symbol: str, st: SymbolState, quote_ccy: str, dry_
                 ((st.avg_entry * st.total_base) + cost) / new_total if new_total > 0 else 0
             )
             st.total_base = new_total
-            st.open_buy_orders.remove(cid)
+            st.open_buy_orders.discard(cid)
             changed = True
             send_telegram(f"✅ BUY FILLED\n{symbol}\nFilled: {filled}\n@ {price}")
 
         # === TAKE PROFIT FILLED ===
         if side == "sell" and cid in st.open_sell_orders:
-            proceeds = filled * price
-            cost_basis = filled * st.avg_entry
-            realized = proceeds - cost_basis
-            st.total_base = max(0.0, st.total_base - filled)
-            st.open_sell_orders.remove(cid)
+            st.open_sell_orders.pop(cid, None)
             changed = True
+            await _book_tp_fill(symbol, st, filled, price)
+    if not (st.open_buy_orders or st.open_sell_orders):
+        st.reconcile_since = 0
+    return changed
 
-            pl.setdefault("trades", []).append(
-                {
-                    "ts": int(time.time()),
-                    "symbol": symbol,
-                    "side": "tp_exit",
-                    "filled": filled,
-                    "price": price,
-                    "realized_usd": realized,
-                }
-            )
-            save_pl(pl)
-            send_telegram(
-                f"🎉 TAKE PROFIT FILLED\n{symbol}\nSold: {filled}\n@ {price}\nPnL: {realized:.2f} USDT"
-            )
-
-    if changed:
-        save_state(symbol, st)
 
-
-def maybe_send_daily_summary(local_tz_str="Africa/Lagos", summary_hour=21):
-    pl = load_pl()
-    tz = pytz.timezone(local_tz_str)
+def maybe_send_daily_summary(local_tz_str=LOCAL_TZ, summary_hour=21):
+    tz = ZoneInfo(local_tz_str)
     now = datetime.now(tz)
-    today_key = now.strftime("%Y-%m-%d")
-    if now.hour != summary_hour or now.minute not in (0, 1):
+    if now.hour != summary_hour or now.minute > 1:
         return
-    if pl.get("last_daily_summary_date") == today_key:
+    today_key = now.strftime("%Y-%m-%d")
+    meta = load_pl_meta()
+    if meta.get("last_daily_summary_date") == today_key:
         return
-    start_ts = int(datetime(now.year, now.month, now.day, tzinfo=tz).timestamp())
     total = 0.0
     lines = []
-    for t in pl.get("trades", []):
-        if t["ts"] >= start_ts:
-            val = float(t.get("realized_usd", 0))
-            total += val
-            lines.append(f"{t['symbol']}: {val:.2f}")
+    # trades are appended in time order, so today's are all at the end
+    for t in iter_trades_reversed():
+        if _date_key(t["ts"], local_tz_str) != today_key:
+            break
+        val = float(t.get("realized_usd", 0))
+        total += val
+        lines.append(f"{t['symbol']}: {val:.2f}")
+    lines.reverse()
     if not lines:
         msg = "📊 DAILY SUMMARY\nNo realized P&L today yet."
     else:
         msg = "📊 DAILY SUMMARY\n" + "\n".join(lines) + f"\n\nTotal: {total:.2f} USDT"
     send_telegram(msg)
-    pl["last_daily_summary_date"] = today_key
-    save_pl(pl)
+    meta["last_daily_summary_date"] = today_key
+    save_pl_meta(meta)
+    rotate_pl()
 
 
-def run_symbol(
+async def run_symbol(
     exchange,
-    sym_cfg: Dict,
+    cfg: SymbolConfig,
     dry_run: bool,
     lookback: int,
     period_rsi: int,
     quote_ccy: str,
     auto_rebuy: bool,
+    ohlcv=None,
+    ticker: Optional[Dict] = None,
 ):
-    symbol = sym_cfg["symbol"]
-    timeframe = sym_cfg["timeframe"]
-    entry_rsi_lt = float(sym_cfg["entry_rsi_lt"])
-    usd_per_entry = float(sym_cfg["usd_per_entry"])
-    dca_steps = int(sym_cfg["dca_steps"])
-    dca_step_pct = float(sym_cfg["dca_step_pct"])
-    max_position_usd = float(sym_cfg["max_position_usd"])
-    take_profits = list(sym_cfg["take_profits"])
-    tp_alloc = list(sym_cfg["tp_allocation"])
-    stop_close_below = float(sym_cfg["stop_close_below"])
-    min_notional_usd = float(sym_cfg.get("min_notional_usd", 10.0))
+    symbol = cfg.symbol
 
     st = load_state(symbol)
-    last = get_price(exchange, symbol)
-    _rsi = fetch_rsi(exchange, symbol, timeframe, lookback, period_rsi)
+    last = (
+        (ticker and _price_from_ticker(ticker))
+        or (ohlcv and ohlcv[-1][4])
+        or await get_price(exchange, symbol)
+    )
+    rsi_ts = st.rsi_last_ts
+    _rsi = await fetch_rsi(exchange, symbol, cfg.timeframe, lookback, period_rsi, ohlcv)
     print(f"[{symbol}] price={last:.8f} RSI={_rsi:.2f} avg={st.avg_entry:.8f} size={st.total_base}")
 
-    reconcile_fills(exchange, symbol, st, quote_ccy, dry_run)
+    dirty = await reconcile_fills(exchange, symbol, st, quote_ccy, dry_run)
+    placed_at = now_ms() - RECONCILE_SLACK_MS
+    dirty = dirty or st.rsi_last_ts != rsi_ts
 
-    if st.total_base > 0 and last < stop_close_below:
-        send_telegram(f"⚠️ STOP EXIT: {symbol}\nPrice: {last:.8f} < {stop_close_below}")
-        cid = place_market_sell(exchange, symbol, st.total_base, dry_run)
+    if st.total_base > 0 and last < cfg.stop_close_below:
+        send_telegram(f"⚠️ STOP EXIT: {symbol}\nPrice: {last:.8f} < {cfg.stop_close_below}")
+        cid = await place_market_sell(exchange, symbol, st.total_base, dry_run)
         if cid:
-            pl = load_pl()
             realized = (last - st.avg_entry) * st.total_base
-            pl.setdefault("trades", []).append(
+            await record_trade(
                 {
                     "ts": int(time.time()),
                     "symbol": symbol,
@@ -290,63 +740,243 @@ def run_symbol(
                     "realized_usd": realized,
                 }
             )
-            save_pl(pl)
-            st = SymbolState()
+            st = SymbolState(
+                rsi_avg_gain=st.rsi_avg_gain,
+                rsi_avg_loss=st.rsi_avg_loss,
+                rsi_last_close=st.rsi_last_close,
+                rsi_last_ts=st.rsi_last_ts,
+            )
+            dirty = True
+        if dirty:
             save_state(symbol, st)
         return
 
     if st.total_base > 0 and st.avg_entry > 0:
-        for idx, tp in enumerate(take_profits):
-            target_price = st.avg_entry * (1.0 + tp)
-            amount = st.total_base * tp_alloc[idx]
-            amount = float(exchange.amount_to_precision(symbol, amount))
-            if amount * last < min_notional_usd:
-                continue
-            cid = place_limit_sell(exchange, symbol, amount, target_price, dry_run)
-            if cid:
-                st.open_sell_orders.append(cid)
-                send_telegram(
-                    f"📈 TAKE PROFIT SET\n{symbol}\nSell @ {target_price:.8f}\nAmount: {amount}"
-                )
-        save_state(symbol, st)
-
-    if _rsi < entry_rsi_lt:
+        target_prices = round_prices(symbol, st.avg_entry * (1.0 + cfg.take_profits))
+        targets = set(target_prices.tolist())
+        # only a buy fill moves the ladder, by changing the entry or growing the
+        # position; a TP fill shrinks the position and leaves the other TPs resting
+        moved = (
+            not st.open_sell_orders
+            or st.total_base > st.tp_ladder_base
+            or any(p and p not in targets for p, _ in st.open_sell_orders.values())
+        )
+        if moved:
+            stale = list(st.open_sell_orders)
+            cancelled = await cancel_orders(exchange, symbol, stale, dry_run)
+            for cid, order in cancelled.items():
+                del st.open_sell_orders[cid]
+                dirty = True
+                filled = float(order.get("filled") or 0)
+                price = float(order.get("average") or order.get("price") or 0)
+                if filled > 0 and price > 0:
+                    await _book_tp_fill(symbol, st, filled, price)
+        # never stack a new ladder on TPs that may still be resting
+        if moved and not st.open_sell_orders:
+            amounts = round_amounts(exchange, symbol, st.total_base * cfg.tp_allocation)
+            valid = can_trade_size(symbol, amounts, last, cfg.min_notional_usd)
+            target_prices, amounts = target_prices[valid].tolist(), amounts[valid].tolist()
+            cids = await place_limit_orders(
+                exchange, symbol, "sell", amounts, target_prices, dry_run
+            )
+            for cid, target_price, amount in zip(cids, target_prices, amounts):
+                if cid:
+                    st.open_sell_orders[cid] = (target_price, amount)
+                    st.reconcile_since = st.reconcile_since or placed_at
+                    dirty = True
+                    send_telegram(
+                        f"📈 TAKE PROFIT SET\n{symbol}\nSell @ {target_price:.8f}\nAmount: {amount}"
+                    )
+            # a partly placed ladder is rebuilt on the next run
+            base = st.total_base if all(cids) else 0.0
+            if base != st.tp_ladder_base:
+                st.tp_ladder_base = base
+                dirty = True
+
+    if _rsi < cfg.entry_rsi_lt:
         if st.anchor_price is None:
             st.anchor_price = last
             st.last_signal_ts = int(time.time() * 1000)
+            dirty = True
             send_telegram(f"🎯 RSI TRIGGER: {symbol}\nAnchor @ {st.anchor_price:.8f}")
 
-        price = st.anchor_price
-        total_usd = 0.0
-        for i in range(dca_steps):
-            buy_price = price * (1.0 - (i * dca_step_pct / 100.0))
-            usd_budget = usd_per_entry
-            if total_usd + usd_budget > max_position_usd:
-                break
-            if usd_budget < min_notional_usd:
-                continue
-            amount = amount_from_usd(exchange, symbol, usd_budget, buy_price)
-            if amount * buy_price < min_notional_usd:
-                continue
-            cid = place_limit_buy(exchange, symbol, amount, buy_price, dry_run)
+        usd_budget = cfg.usd_per_entry
+        buy_prices = round_prices(symbol, st.anchor_price * cfg.dca_levels)
+        amounts = round_amounts(exchange, symbol, usd_budget / buy_prices)
+        valid = can_trade_size(symbol, amounts, buy_prices, cfg.min_notional_usd) & (
+            usd_budget >= cfg.min_notional_usd
+        )
+        # buys still resting from earlier cycles count against the cap; their
+        # ids are only kept when the exchange accepted them
+        committed = len(st.open_buy_orders) * usd_budget
+        valid &= committed + np.cumsum(valid) * usd_budget <= cfg.max_position_usd
+        buy_prices, amounts = buy_prices[valid].tolist(), amounts[valid].tolist()
+        cids = await place_limit_orders(exchange, symbol, "buy", amounts, buy_prices, dry_run)
+        for cid, buy_price, amount in zip(cids, buy_prices, amounts):
             if cid:
-                st.open_buy_orders.append(cid)
-                total_usd += usd_budget
+                st.open_buy_orders.add(cid)
+                st.reconcile_since = st.reconcile_since or placed_at
+                dirty = True
                 send_telegram(f"📉 BUY PLACED\n{symbol}\n@ {buy_price:.8f}\nAmount: {amount}")
-        save_state(symbol, st)
     else:
-        if st.anchor_price and _rsi > entry_rsi_lt + 10:
+        if st.anchor_price and _rsi > cfg.entry_rsi_lt + 10:
             st.anchor_price = None
-            save_state(symbol, st)
+            dirty = True
 
-    if auto_rebuy and st.total_base == 0 and _rsi < entry_rsi_lt:
+    if auto_rebuy and st.total_base == 0 and _rsi < cfg.entry_rsi_lt:
         if st.anchor_price is None:
             st.anchor_price = last
+            dirty = True
             send_telegram(f"🔁 AUTO-REBUY ARMED: {symbol}\nAnchor @ {st.anchor_price:.8f}")
-            save_state(symbol, st)
+
+    if dirty:
+        save_state(symbol, st)
 
 
-def main():
+WS_SILENCE_S = 300
+WS_BACKOFF_MAX_S = 60.0
+_LIVE_TICKERS: Dict[str, Dict] = {}
+
+
+async def _backoff(delay: float) -> float:
+    await asyncio.sleep(delay)
+    return min(delay * 2, WS_BACKOFF_MAX_S)
+
+
+async def _watch(label: str, watch):
+    """
+    Await one stream update. ccxt.pro pings the socket and reconnects on its
+    own, so a stream that stays silent for WS_SILENCE_S is only logged and
+    waited on again.
+    """
+    try:
+        return await asyncio.wait_for(watch(), WS_SILENCE_S)
+    except asyncio.TimeoutError:
+        print(f"[{label}] no update for {WS_SILENCE_S}s, still waiting")
+        return None
+
+
+async def watch_ticker(exchange, symbol: str):
+    """Keep the latest streamed ticker for `symbol` in _LIVE_TICKERS."""
+    delay = 1.0
+    while True:
+        try:
+            ticker = await _watch(symbol, lambda: exchange.watch_ticker(symbol))
+        except Exception as e:
+            print(f"[{symbol}] ticker stream error: {e}")
+            _LIVE_TICKERS.pop(symbol, None)
+            delay = await _backoff(delay)
+            continue
+        if ticker:
+            _LIVE_TICKERS[symbol] = ticker
+            delay = 1.0
+
+
+async def _stream_candles(exchange, cfg: SymbolConfig, box: asyncio.Queue):
+    """Feed the latest candle tail into `box`, replacing one the strategy has not taken yet."""
+    tail: Deque[list] = deque(maxlen=TAIL_LIMIT)
+    delay = 1.0
+    while True:
+        try:
+            candles = await _watch(
+                cfg.symbol, lambda: exchange.watch_ohlcv(cfg.symbol, cfg.timeframe)
+            )
+        except Exception as e:
+            print(f"[{cfg.symbol}] candle stream error: {e}")
+            delay = await _backoff(delay)
+            continue
+        if not candles:
+            continue
+        delay = 1.0
+        for c in candles:
+            if not tail or c[0] > tail[-1][0]:
+                tail.append(c)
+                continue
+            # an update to a candle already in the window, usually the open one
+            for i, old in enumerate(tail):
+                if old[0] == c[0]:
+                    tail[i] = c
+                    break
+        if box.full():
+            box.get_nowait()
+        box.put_nowait(list(tail))
+
+
+async def watch_symbol(exchange, cfg: SymbolConfig, poll: int, *args):
+    """
+    Drive run_symbol from the websocket candle stream. The strategy runs when
+    a candle closes, and otherwise at most once every `poll` seconds. Candles
+    are read by a separate task, so a burst of updates during a slow run is
+    collapsed into the newest tail instead of queueing up. The reader is
+    restarted if it dies.
+    """
+    box: asyncio.Queue = asyncio.Queue(maxsize=1)
+    reader = asyncio.create_task(_stream_candles(exchange, cfg, box))
+    getter = None
+    last_run = 0.0
+    try:
+        while True:
+            getter = getter or asyncio.ensure_future(box.get())
+            await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if reader.done():
+                print(f"[{cfg.symbol}] candle reader stopped: {reader.exception()!r}, restarting")
+                await asyncio.sleep(poll)
+                reader = asyncio.create_task(_stream_candles(exchange, cfg, box))
+            if not getter.done():
+                continue
+            ohlcv = getter.result()
+            getter = None
+            rsi_ts = load_state(cfg.symbol).rsi_last_ts
+            closed = rsi_ts == 0 or (len(ohlcv) > 1 and ohlcv[-2][0] > rsi_ts)
+            if not closed and time.monotonic() - last_run < poll:
+                continue
+            last_run = time.monotonic()
+            try:
+                ticker = _LIVE_TICKERS.get(cfg.symbol)
+                await run_symbol(exchange, cfg, *args, ohlcv=ohlcv, ticker=ticker)
+                flush_state()
+            except Exception as e:
+                print(f"[{cfg.symbol}] ERROR: {e}")
+                await asyncio.sleep(poll)
+    finally:
+        reader.cancel()
+        if getter:
+            getter.cancel()
+
+
+async def _safe_run(exchange, cfg: SymbolConfig, *args, **kwargs):
+    try:
+        await run_symbol(exchange, cfg, *args, **kwargs)
+    except Exception as e:
+        print(f"[{cfg.symbol}] ERROR: {e}")
+
+
+async def poll_loop(exchange, symbols, poll: int, *args):
+    """REST fallback: one batched ticker request per tick, then all symbols concurrently."""
+    while True:
+        try:
+            tickers = await exchange.fetch_tickers([s.symbol for s in symbols])
+        except Exception as e:
+            print(f"[TICKERS] error: {e}")
+            tickers = {}
+        await asyncio.gather(
+            *[_safe_run(exchange, s, *args, ticker=tickers.get(s.symbol)) for s in symbols]
+        )
+        flush_state()
+        await asyncio.sleep(poll)
+
+
+async def summary_loop(summary_hour: int, poll: int):
+    while True:
+        try:
+            async with _PL_LOCK:
+                maybe_send_daily_summary(LOCAL_TZ, summary_hour)
+        except Exception as e:
+            print(f"[SUMMARY] error: {e}")
+        await asyncio.sleep(poll)
+
+
+async def main_async():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="config.json")
     args = ap.parse_args()
@@ -361,27 +991,32 @@ def main():
     quote_ccy = cfg.get("quote_currency", "USDT")
     auto_rebuy = bool(cfg.get("auto_rebuy", True))
     summary_hour = int(cfg.get("daily_summary_hour", 21))
+    use_websocket = bool(cfg.get("use_websocket", True))
 
     ensure_state_dir()
-    if not os.path.exists(P_L_FILE):
-        save_pl({"trades": [], "last_daily_summary_date": ""})
+    migrate_pl()
+    rotate_pl()
 
-    exchange = make_exchange(dry_run)
-    symbols = cfg["symbols"]
+    exchange = await make_exchange(dry_run)
+    symbols = [SymbolConfig(**_coerce(s)) for s in cfg["symbols"]]
+    args = (dry_run, lookback, period_rsi, quote_ccy, auto_rebuy)
 
     send_telegram("🤖 Bot online. Monitoring markets...")
 
-    while True:
-        for s in symbols:
-            try:
-                run_symbol(exchange, s, dry_run, lookback, period_rsi, quote_ccy, auto_rebuy)
-            except Exception as e:
-                print(f"[{s['symbol']}] ERROR: {e}")
-        try:
-            maybe_send_daily_summary("Africa/Lagos", summary_hour)
-        except Exception as e:
-            print(f"[SUMMARY] error: {e}")
-        time.sleep(poll)
+    if use_websocket:
+        tasks = [watch_symbol(exchange, s, poll, *args) for s in symbols]
+        tasks += [watch_ticker(exchange, s.symbol) for s in symbols]
+    else:
+        tasks = [poll_loop(exchange, symbols, poll, *args)]
+    try:
+        await asyncio.gather(telegram_worker(), summary_loop(summary_hour, poll), *tasks)
+    finally:
+        flush_state()
+        await exchange.close()
+
+
+def main():
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":
@@ -1,29 +1,65 @@
-import json
+import asyncio
 import os
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List
-
-import ccxt
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import ccxt.async_support as ccxt
+import numpy as np
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 STATE_DIR = os.path.join(APP_DIR, "STATE")
 CONFIG_PATH = os.path.join(APP_DIR, "config.json")
-PL_PATH = os.path.join(STATE_DIR, "profit_log.json")
+PL_META_PATH = os.path.join(STATE_DIR, "profit_log.meta.json")
+LOCAL_TZ = "Africa/Lagos"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    exchange = await make_public_exchange()
+    price_task = asyncio.create_task(ticker_refresh_loop(exchange))
+    try:
+        yield
+    finally:
+        price_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await price_task
+        await exchange.close()
+
 
-app = FastAPI(title="Trading Dashboard")
+app = FastAPI(title="Trading Dashboard", lifespan=lifespan)
 templates = Jinja2Templates(directory=os.path.join(APP_DIR, "templates"))
 app.mount("/static", StaticFiles(directory=os.path.join(APP_DIR, "static")), name="static")
 
 
+_JSON_CACHE: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+
+
+def _read_json(path: str) -> Any:
+    """Parse a JSON file, reusing the last result while the file looks unchanged."""
+    st = os.stat(path)
+    # the bot replaces files atomically, which gives them a new inode; the size
+    # catches rewrites that land within the filesystem's mtime granularity
+    key = (st.st_mtime_ns, st.st_ino, st.st_size)
+    cached = _JSON_CACHE.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    _JSON_CACHE[path] = (key, data)
+    return data
+
+
 def load_config() -> Dict[str, Any]:
     try:
-        with open(CONFIG_PATH, "r") as f:
-            return json.load(f)
+        return _read_json(CONFIG_PATH)
     except Exception:
         return {
             "quote_currency": "USDT",
@@ -34,57 +70,55 @@ def load_config() -> Dict[str, Any]:
 def load_state_for(symbol: str) -> Dict[str, Any]:
     safe = symbol.replace("/", "_")
     path = os.path.join(STATE_DIR, f"{safe}.json")
-    if not os.path.exists(path):
-        return {"avg_entry": 0.0, "total_base": 0.0}
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        return _read_json(path)
     except Exception:
         return {"avg_entry": 0.0, "total_base": 0.0}
 
 
 def load_profit_log() -> Dict[str, Any]:
-    if not os.path.exists(PL_PATH):
-        return {"trades": []}
     try:
-        with open(PL_PATH, "r") as f:
-            return json.load(f)
+        return _read_json(PL_META_PATH)
     except Exception:
-        return {"trades": []}
+        return {}
+
+
+PRICE_REFRESH_S = 2
+_PRICE_CACHE: Dict[str, float] = {}
 
 
-def make_public_exchange():
+async def make_public_exchange():
     ex = ccxt.gateio({"enableRateLimit": True, "options": {"defaultType": "spot"}})
     ex.timeout = 20000
     try:
-        ex.load_markets(params={"type": "spot"})
+        await ex.load_markets(params={"type": "spot"})
     except Exception:
         pass
     return ex
 
 
-EXCHANGE = make_public_exchange()
+async def ticker_refresh_loop(ex):
+    """Refresh all configured prices with one fetch_tickers call per interval."""
+    while True:
+        symbols = [s["symbol"] for s in load_config().get("symbols", [])]
+        try:
+            for sym, t in (await ex.fetch_tickers(symbols)).items():
+                _PRICE_CACHE[sym] = float(t.get("last") or t.get("close") or 0.0)
+        except Exception:
+            pass
+        await asyncio.sleep(PRICE_REFRESH_S)
 
 
 def get_last_price(symbol: str) -> float:
-    try:
-        t = EXCHANGE.fetch_ticker(symbol)
-        return float(t.get("last") or t.get("close") or 0.0)
-    except Exception:
-        return 0.0
+    return _PRICE_CACHE.get(symbol, 0.0)
 
 
-def realized_today_usd(pl: Dict[str, Any]) -> float:
-    now = datetime.now(timezone.utc)
-    start = datetime(year=now.year, month=now.month, day=now.day, tzinfo=timezone.utc).timestamp()
-    total = 0.0
-    for t in pl.get("trades", []):
-        try:
-            if float(t.get("ts", 0)) >= start:
-                total += float(t.get("realized_usd", 0.0))
-        except Exception:
-            continue
-    return total
+def realized_today_usd(meta: Dict[str, Any]) -> float:
+    # the bot keeps a running total for its local day
+    today = datetime.now(ZoneInfo(LOCAL_TZ)).strftime("%Y-%m-%d")
+    if meta.get("today_date") != today:
+        return 0.0
+    return float(meta.get("today_realized_usd", 0.0))
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -97,30 +131,34 @@ async def index(request: Request):
 @app.get("/api/status")
 async def status():
     cfg = load_config()
-    out: List[Dict[str, Any]] = []
-    for s in cfg.get("symbols", []):
-        sym = s["symbol"]
-        st = load_state_for(sym)
-        price = get_last_price(sym)
-        avg = float(st.get("avg_entry", 0.0) or 0.0)
-        base = float(st.get("total_base", 0.0) or 0.0)
-        unrealized = 0.0
-        unrealized_pct = 0.0
-        if base > 0 and avg > 0 and price > 0:
-            unrealized = (price - avg) * base
-            unrealized_pct = ((price / avg) - 1.0) * 100.0
-        out.append(
-            {
-                "symbol": sym,
-                "price": price,
-                "avg_entry": avg,
-                "position": base,
-                "unrealized_usd": unrealized,
-                "unrealized_pct": unrealized_pct,
-            }
+    symbols = [s["symbol"] for s in cfg.get("symbols", [])]
+    states = [load_state_for(sym) for sym in symbols]
+    prices = np.array([get_last_price(sym) for sym in symbols], dtype=np.float64)
+    avgs = np.array([float(st.get("avg_entry", 0.0) or 0.0) for st in states], dtype=np.float64)
+    bases = np.array([float(st.get("total_base", 0.0) or 0.0) for st in states], dtype=np.float64)
+    live = (bases > 0) & (avgs > 0) & (prices > 0)
+    unrealized = np.where(live, (prices - avgs) * bases, 0.0)
+    unrealized_pct = np.where(live, (prices / np.where(live, avgs, 1.0) - 1.0) * 100.0, 0.0)
+    out: List[Dict[str, Any]] = [
+        {
+            "symbol": sym,
+            "price": price,
+            "avg_entry": avg,
+            "position": base,
+            "unrealized_usd": upnl,
+            "unrealized_pct": upct,
+        }
+        for sym, price, avg, base, upnl, upct in zip(
+            symbols,
+            prices.tolist(),
+            avgs.tolist(),
+            bases.tolist(),
+            unrealized.tolist(),
+            unrealized_pct.tolist(),
         )
+    ]
     pl = load_profit_log()
-    return JSONResponse(
+    return ORJSONResponse(
         {
             "symbols": out,
             "realized_today_usd": realized_today_usd(pl),
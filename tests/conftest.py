@@ -0,0 +1,70 @@
+import asyncio
+
+import ccxt
+import pytest
+
+import bot
+
+
+class FakeExchange:
+    """In-memory exchange: serves fixed candles and closed orders, records what the bot sends."""
+
+    parse_timeframe = staticmethod(ccxt.Exchange.parse_timeframe)
+
+    def __init__(self):
+        self.candles = []
+        self.ohlcv_calls = []
+        self.orders = []
+        self.orders_since = []
+        self.placed = []
+        self.cancelled = []
+        self.cancel_fails = False
+        self.cancel_replies = {}
+        self.tickers_fetched = asyncio.Event()
+        self.closed = False
+
+    async def fetch_ohlcv(self, symbol, timeframe="15m", since=None, limit=None):
+        self.ohlcv_calls.append((since, limit))
+        if since is not None:
+            return [c for c in self.candles if c[0] >= since][:limit]
+        return self.candles[-limit:]
+
+    async def fetch_closed_orders(self, symbol, since=None, limit=None):
+        self.orders_since.append(since)
+        orders = sorted(self.orders, key=lambda o: o["timestamp"])
+        return [o for o in orders if since is None or o["timestamp"] >= since][:limit]
+
+    def amount_to_precision(self, symbol, amount):
+        return str(amount)
+
+    async def cancel_order(self, order_id, symbol):
+        if self.cancel_fails:
+            raise ccxt.NetworkError("timeout")
+        self.cancelled.append(order_id)
+        return self.cancel_replies.get(order_id, {})
+
+    async def create_orders(self, batch):
+        self.placed.extend((o["price"], o["amount"]) for o in batch)
+        return [{"status": "open"} for _ in batch]
+
+    async def fetch_tickers(self, symbols):
+        self.tickers_fetched.set()
+        return {s: {"last": 1.5} for s in symbols}
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def exchange():
+    return FakeExchange()
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bot, "_state_cache", {})
+    monkeypatch.setattr(bot, "_RSI_MEMO", {})
+    # asyncio primitives bind to the first loop that waits on them
+    monkeypatch.setattr(bot, "_PL_LOCK", asyncio.Lock())
+    bot.ensure_state_dir()
@@ -0,0 +1,36 @@
+import asyncio
+
+import orjson
+
+import dashboard
+
+
+def test_refresh_loop_fills_the_price_cache(exchange, monkeypatch):
+    monkeypatch.setattr(dashboard, "_PRICE_CACHE", {})
+
+    async def go():
+        task = asyncio.create_task(dashboard.ticker_refresh_loop(exchange))
+        await exchange.tickers_fetched.wait()
+        task.cancel()
+
+    asyncio.run(go())
+    symbols = [s["symbol"] for s in dashboard.load_config()["symbols"]]
+    assert symbols and all(dashboard.get_last_price(s) == 1.5 for s in symbols)
+
+
+def test_lifespan_refreshes_prices_and_closes_exchange(exchange, monkeypatch):
+    monkeypatch.setattr(dashboard, "_PRICE_CACHE", {})
+
+    async def make_public_exchange():
+        return exchange
+
+    monkeypatch.setattr(dashboard, "make_public_exchange", make_public_exchange)
+
+    async def go():
+        async with dashboard.lifespan(dashboard.app):
+            await exchange.tickers_fetched.wait()
+            return orjson.loads((await dashboard.status()).body)
+
+    prices = [s["price"] for s in asyncio.run(go())["symbols"]]
+    assert prices and all(p == 1.5 for p in prices)
+    assert exchange.closed
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+import bot
+
+CFG = {
+    "symbol": "JTO/USDT",
+    "timeframe": "15m",
+    "entry_rsi_lt": 30,
+    "usd_per_entry": 10,
+    "dca_steps": 3,
+    "dca_step_pct": 1,
+    "max_position_usd": 20,
+    "take_profits": [0.5],
+    "tp_allocation": [1.0],
+    "stop_close_below": 0,
+}
+
+
+@pytest.fixture
+def exchange(exchange):
+    # steadily falling closes pin the RSI at 0, well under the entry threshold
+    exchange.candles = [[i * 900_000, 0, 0, 0, 200.0 - i] for i in range(1, 80)]
+    return exchange
+
+
+def run(ex):
+    cfg = bot.SymbolConfig(**bot._coerce(CFG))
+    asyncio.run(bot.run_symbol(ex, cfg, False, 200, 14, "USDT", False, ticker={"last": 100.0}))
+    return bot.load_state(cfg.symbol)
+
+
+def test_resting_buys_count_against_the_position_cap(exchange):
+    st = run(exchange)
+    assert len(exchange.placed) == 2
+    assert len(st.open_buy_orders) == 2
+
+    run(exchange)
+    assert len(exchange.placed) == 2
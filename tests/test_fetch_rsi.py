@@ -0,0 +1,66 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import bot
+from utils import rsi_from_avg, rsi_seed, rsi_step
+
+TF = "15m"
+TF_MS = 15 * 60 * 1000
+PERIOD = 14
+
+
+def candles(n: int):
+    return [[i * TF_MS, 0, 0, 0, 100 + 3 * np.sin(i / 3) + (i % 5) * 0.4] for i in range(1, n + 1)]
+
+
+def wilder_rsi(seed, tail) -> float:
+    """Seed Wilder's averages on `seed` closes, then step through `tail` closes."""
+    avg_gain, avg_loss = rsi_seed(np.asarray(seed, dtype=np.float64), PERIOD)
+    prev = seed[-1]
+    for close in tail:
+        avg_gain, avg_loss = rsi_step(avg_gain, avg_loss, close - prev, PERIOD)
+        prev = close
+    return rsi_from_avg(avg_gain, avg_loss)
+
+
+def fresh_rsi(ex) -> float:
+    closes = [c[4] for c in ex.candles[-(PERIOD + 50) :]]
+    return wilder_rsi(closes[:-1], closes[-1:])
+
+
+def fetch(ex) -> float:
+    return asyncio.run(bot.fetch_rsi(ex, "JTO/USDT", TF, 200, PERIOD))
+
+
+def test_later_polls_fetch_only_the_tail(exchange):
+    exchange.candles = candles(120)
+    assert fetch(exchange) == pytest.approx(fresh_rsi(exchange))
+    seed = [c[4] for c in exchange.candles[-(PERIOD + 50) : -1]]
+    exchange.candles = candles(122)
+    tail = [c[4] for c in exchange.candles[-3:]]
+    assert fetch(exchange) == pytest.approx(wilder_rsi(seed, tail))
+    since, limit = exchange.ohlcv_calls[-1]
+    assert since is not None and limit == bot.TAIL_LIMIT
+
+
+def test_reseed_after_gap_matches_fresh_seed(exchange):
+    exchange.candles = candles(120)
+    assert fetch(exchange) == pytest.approx(fresh_rsi(exchange))
+    exchange.candles = candles(130)
+    assert fetch(exchange) == pytest.approx(fresh_rsi(exchange))
+
+
+def test_restored_state_far_in_the_past_reseeds(exchange):
+    exchange.candles = candles(120)
+    stale = bot.SymbolState(
+        rsi_avg_gain=9.0, rsi_avg_loss=0.1, rsi_last_close=1.0, rsi_last_ts=5 * TF_MS
+    )
+    with open(bot.state_path("JTO/USDT"), "wb") as f:
+        f.write(bot.orjson.dumps(stale, default=sorted))
+
+    assert fetch(exchange) == pytest.approx(fresh_rsi(exchange))
+    st = bot.load_state("JTO/USDT")
+    assert st.rsi_last_ts == exchange.candles[-2][0]
+    assert st.rsi_last_close == exchange.candles[-2][4]
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import time
+
+import orjson
+import pytest
+
+import bot
+
+
+def write_legacy_log():
+    now = int(time.time())
+    legacy = {
+        "trades_by_date": {
+            "2020-01-02": [{"ts": 1577966400, "symbol": "B", "realized_usd": 2.5}],
+            "2020-01-01": [{"ts": 1577880000, "symbol": "A", "realized_usd": 1.0}],
+            bot._date_key(now): [{"ts": now, "symbol": "C", "realized_usd": 2.5}],
+        },
+        "last_daily_summary_date": "2020-01-02",
+    }
+    with open("STATE/profit_log.json", "wb") as f:
+        f.write(orjson.dumps(legacy))
+
+
+def test_migration_flattens_legacy_buckets_in_time_order():
+    write_legacy_log()
+    bot.migrate_pl()
+
+    assert [t["symbol"] for t in bot.iter_trades()] == ["A", "B", "C"]
+    assert bot.load_pl_meta()["last_daily_summary_date"] == "2020-01-02"
+    assert not os.path.exists("STATE/profit_log.json")
+
+
+def test_append_trade_adds_one_line():
+    bot.append_trade({"ts": 1, "symbol": "A", "realized_usd": 1.0})
+    bot.append_trade({"ts": 2, "symbol": "B", "realized_usd": -0.5})
+
+    assert [t["symbol"] for t in bot.iter_trades()] == ["A", "B"]
+
+
+def test_migration_rerun_after_crash_does_not_duplicate():
+    write_legacy_log()
+    bot.migrate_pl()
+    # as if the process died before the legacy file was removed
+    write_legacy_log()
+    bot.migrate_pl()
+
+    assert [t["symbol"] for t in bot.iter_trades()] == ["A", "B", "C"]
+    assert bot.load_pl_meta()["today_realized_usd"] == pytest.approx(2.5)
+
+
+def test_identical_legacy_trades_are_both_migrated():
+    trade = {"ts": 1577880000, "symbol": "A", "realized_usd": 1.0}
+    with open("STATE/profit_log.json", "wb") as f:
+        f.write(orjson.dumps({"trades_by_date": {"2020-01-01": [trade, trade]}}))
+    bot.migrate_pl()
+
+    assert list(bot.iter_trades()) == [trade, trade]
+
+
+def test_reversed_read_matches_forward_read_across_blocks():
+    for i in range(50):
+        bot.append_trade({"ts": i, "symbol": f"S{i}", "realized_usd": 0.0})
+
+    trades = list(bot.iter_trades())
+    assert list(bot.iter_trades_reversed(block=7)) == trades[::-1]
+
+
+def test_record_trade_keeps_a_running_total_for_today():
+    async def go():
+        now = int(time.time())
+        await asyncio.gather(
+            *[bot.record_trade({"ts": now, "symbol": "A", "realized_usd": 1.5}) for _ in range(3)]
+        )
+
+    asyncio.run(go())
+    assert bot.load_pl_meta()["today_realized_usd"] == pytest.approx(4.5)
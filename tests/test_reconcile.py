@@ -0,0 +1,99 @@
+import asyncio
+
+import bot
+
+
+def reconcile(ex, st):
+    return asyncio.run(bot.reconcile_fills(ex, "JTO/USDT", st, "USDT", False))
+
+
+def test_fetch_starts_at_the_oldest_tracked_order(exchange):
+    st = bot.SymbolState(open_buy_orders={"buy-1"}, reconcile_since=123)
+    exchange.orders = [
+        {
+            "id": "1",
+            "timestamp": 200,
+            "clientOrderId": "t-buy-1",
+            "side": "buy",
+            "status": "closed",
+            "filled": 2.0,
+            "average": 5.0,
+        }
+    ]
+    assert reconcile(exchange, st)
+    assert exchange.orders_since == [123]
+    assert st.total_base == 2.0 and st.avg_entry == 5.0
+    assert st.reconcile_since == 0
+
+    # nothing tracked any more, so nothing is fetched
+    assert not reconcile(exchange, st)
+    assert exchange.orders_since == [123]
+
+
+def test_unfilled_closed_orders_are_dropped_and_window_cleared(exchange):
+    st = bot.SymbolState(
+        open_buy_orders={"buy-1"},
+        open_sell_orders={"sell-1": (100.0, 1.0)},
+        reconcile_since=123,
+    )
+    exchange.orders = [
+        {
+            "id": "2",
+            "timestamp": 200,
+            "clientOrderId": "t-buy-1",
+            "side": "buy",
+            "status": "canceled",
+            "filled": 0,
+        },
+        {
+            "id": "3",
+            "timestamp": 200,
+            "clientOrderId": "t-sell-1",
+            "side": "sell",
+            "status": "expired",
+            "filled": 0,
+        },
+    ]
+    assert reconcile(exchange, st)
+    assert not st.open_buy_orders and not st.open_sell_orders
+    assert st.reconcile_since == 0
+    assert st.total_base == 0
+
+
+def test_partially_filled_cancel_books_the_fill(exchange):
+    st = bot.SymbolState(open_buy_orders={"buy-1"}, reconcile_since=123)
+    exchange.orders = [
+        {
+            "id": "4",
+            "timestamp": 200,
+            "clientOrderId": "t-buy-1",
+            "side": "buy",
+            "status": "canceled",
+            "filled": 2.0,
+            "average": 5.0,
+        }
+    ]
+    assert reconcile(exchange, st)
+    assert st.total_base == 2.0 and st.avg_entry == 5.0
+    assert not st.open_buy_orders
+
+
+def test_fills_past_the_first_page_are_found(exchange):
+    st = bot.SymbolState(open_buy_orders={"buy-1"}, reconcile_since=123)
+    # batches of ten share a timestamp, so pages overlap on their boundaries
+    exchange.orders = [
+        {
+            "id": str(i),
+            "timestamp": 200 + i // 10,
+            "clientOrderId": f"t-other-{i}",
+            "side": "buy",
+            "status": "closed",
+            "filled": 1.0,
+            "average": 1.0,
+        }
+        for i in range(120)
+    ]
+    exchange.orders[115]["clientOrderId"] = "t-buy-1"
+    assert reconcile(exchange, st)
+    assert st.total_base == 1.0
+    assert exchange.orders_since[0] == 123 and len(exchange.orders_since) > 2
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import bot
+
+CFG = {
+    "symbol": "JTO/USDT",
+    "timeframe": "15m",
+    "entry_rsi_lt": 30,
+    "usd_per_entry": 10,
+    "dca_steps": 1,
+    "dca_step_pct": 1,
+    "max_position_usd": 10,
+    "take_profits": [0.5, 1.0],
+    "tp_allocation": [0.5, 0.5],
+    "stop_close_below": 0,
+}
+
+
+@pytest.fixture
+def exchange(exchange):
+    # flat candles keep the RSI away from the entry threshold
+    exchange.candles = [[i * 900_000, 0, 0, 0, 80.0] for i in range(1, 80)]
+    return exchange
+
+
+def run(ex):
+    cfg = bot.SymbolConfig(**bot._coerce(CFG))
+    asyncio.run(bot.run_symbol(ex, cfg, False, 200, 14, "USDT", False, ticker={"last": 80.0}))
+    return bot.load_state(cfg.symbol)
+
+
+def position(total_base):
+    st = bot.load_state("JTO/USDT")
+    st.avg_entry, st.total_base = 50.0, total_base
+
+
+def test_unchanged_ladder_is_not_replaced(exchange):
+    position(10.0)
+    run(exchange)
+    st = run(exchange)
+    assert exchange.placed == [(75.0, 5.0), (100.0, 5.0)]
+    assert sorted(st.open_sell_orders.values()) == exchange.placed
+    assert exchange.cancelled == []
+
+
+def test_grown_position_replaces_the_old_ladder(exchange):
+    position(10.0)
+    old = set(run(exchange).open_sell_orders)
+    position(20.0)
+    st = run(exchange)
+    assert sorted(exchange.cancelled) == sorted(f"t-{cid}" for cid in old)
+    assert sorted(st.open_sell_orders.values()) == [(75.0, 10.0), (100.0, 10.0)]
+
+
+def test_failed_cancel_keeps_old_ladder_and_places_nothing(exchange):
+    position(10.0)
+    run(exchange)
+    position(20.0)
+    exchange.placed.clear()
+    exchange.cancel_fails = True
+    st = run(exchange)
+    assert exchange.placed == []
+    assert sorted(st.open_sell_orders.values()) == [(75.0, 5.0), (100.0, 5.0)]
+
+
+def test_filled_take_profit_leaves_the_rest_of_the_ladder(exchange):
+    position(10.0)
+    st = run(exchange)
+    first = next(cid for cid, level in st.open_sell_orders.items() if level == (75.0, 5.0))
+    exchange.orders = [
+        {
+            "id": "1",
+            "timestamp": bot.now_ms(),
+            "clientOrderId": f"t-{first}",
+            "side": "sell",
+            "status": "closed",
+            "filled": 5.0,
+            "average": 75.0,
+        }
+    ]
+    st = run(exchange)
+    assert st.total_base == 5.0
+    assert list(st.open_sell_orders.values()) == [(100.0, 5.0)]
+    assert exchange.cancelled == []
+    assert exchange.placed == [(75.0, 5.0), (100.0, 5.0)]
+
+
+def test_cancelled_take_profit_books_its_partial_fill(exchange):
+    position(10.0)
+    st = run(exchange)
+    first = next(cid for cid, level in st.open_sell_orders.items() if level == (75.0, 5.0))
+    exchange.cancel_replies[f"t-{first}"] = {"status": "canceled", "filled": 2.0, "average": 75.0}
+    position(20.0)
+    st = run(exchange)
+    assert st.total_base == 18.0
+    assert sorted(st.open_sell_orders.values()) == [(75.0, 9.0), (100.0, 9.0)]
+    [trade] = bot.iter_trades()
+    assert trade["filled"] == 2.0 and trade["realized_usd"] == pytest.approx(50.0)
+
+
+def test_legacy_take_profits_are_kept(exchange):
+    legacy = {"avg_entry": 50.0, "total_base": 10.0, "open_sell_orders": ["a", "b"]}
+    with open(bot.state_path("JTO/USDT"), "wb") as f:
+        f.write(bot.orjson.dumps(legacy))
+    st = run(exchange)
+    assert exchange.cancelled == [] and exchange.placed == []
+    assert set(st.open_sell_orders) == {"a", "b"}
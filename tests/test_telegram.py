@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+import bot
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return "Bad Request"
+
+
+class FakeSession:
+    def __init__(self, status=200):
+        self.status = status
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def head(self, url):
+        return FakeResponse(200)
+
+    def get(self, url, params):
+        self.sent.append(params["text"])
+        return FakeResponse(self.status)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(bot.aiohttp, "ClientSession", lambda **kwargs: session)
+    monkeypatch.setattr(bot, "_TG_QUEUE", asyncio.Queue())
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "token")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "chat")
+    return session
+
+
+def drain(*messages):
+    async def go():
+        for msg in messages:
+            bot.send_telegram(msg)
+        task = asyncio.create_task(bot.telegram_worker())
+        # the fake session never waits, so a few loop turns empty the queue
+        for _ in range(10):
+            await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(go())
+
+
+def test_worker_without_credentials_returns_at_once(session, monkeypatch):
+    def no_session(**kwargs):
+        raise AssertionError("opened a session without credentials")
+
+    monkeypatch.setattr(bot.aiohttp, "ClientSession", no_session)
+    monkeypatch.delenv("TELEGRAM_BOT_TOKEN")
+    asyncio.run(bot.telegram_worker())
+
+
+def test_backlog_is_joined_and_long_messages_are_split(session):
+    drain("a", "b", "x" * (bot.TG_MAX_LEN + 10), "c")
+    assert session.sent == ["a\n\nb", "x" * bot.TG_MAX_LEN, "x" * 10 + "\n\nc"]
+
+
+def test_failed_send_is_logged(session, capsys):
+    session.status = 400
+    drain("a")
+    assert "[ERR] TELEGRAM: HTTP 400 Bad Request" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+import asyncio
+from contextlib import suppress
+
+import bot
+
+CFG = {
+    "symbol": "JTO/USDT",
+    "timeframe": "1m",
+    "entry_rsi_lt": 30,
+    "usd_per_entry": 10,
+    "dca_steps": 1,
+    "dca_step_pct": 1,
+    "max_position_usd": 10,
+    "take_profits": [0.1],
+    "tp_allocation": [1.0],
+    "stop_close_below": 0,
+}
+
+
+class FlakyStream:
+    def __init__(self):
+        self.calls = 0
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        await asyncio.sleep(0)
+        self.calls += 1
+        if self.calls == 2:
+            return [[None]]  # malformed candle breaks the reader outside the watch call
+        return [[self.calls * 60_000, 0, 0, 0, 1.0]]
+
+
+def test_dead_candle_reader_is_restarted(monkeypatch):
+    runs = []
+
+    async def fake_run_symbol(exchange, cfg, *args, ohlcv=None, ticker=None):
+        runs.append(ohlcv[-1][0])
+
+    monkeypatch.setattr(bot, "run_symbol", fake_run_symbol)
+    cfg = bot.SymbolConfig(**bot._coerce(CFG))
+
+    async def go():
+        task = asyncio.create_task(bot.watch_symbol(FlakyStream(), cfg, 0))
+        # nothing waits on I/O, so a bounded number of loop turns is enough
+        for _ in range(50):
+            await asyncio.sleep(0)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(go())
+    assert max(runs) > 2 * 60_000
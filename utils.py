@@ -1,9 +1,18 @@
-import hashlib
-import math
-import random
+import secrets
 import time
 from typing import List
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
 
 def rsi(values: List[float], period: int = 14) -> float:
     """Compute RSI(14) from a list of closing prices."""
@@ -25,6 +34,41 @@ def rsi(values: List[float], period: int = 14) -> float:
     return 100 - (100 / (1 + rs))
 
 
+@njit(cache=True)
+def rsi_step(avg_gain: float, avg_loss: float, diff: float, period: int):
+    """Advance Wilder's average gain/loss by one price change."""
+    gain = diff if diff > 0 else 0.0
+    loss = -diff if diff < 0 else 0.0
+    return (avg_gain * (period - 1) + gain) / period, (avg_loss * (period - 1) + loss) / period
+
+
+@njit(cache=True)
+def rsi_seed(closes: np.ndarray, period: int = 14):
+    """Seed Wilder's average gain/loss from a history of closing prices."""
+    n = closes.shape[0]
+    if n < period + 1:
+        return np.nan, np.nan
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        diff = closes[i] - closes[i - 1]
+        if diff >= 0:
+            gain += diff
+        else:
+            loss -= diff
+    avg_gain = gain / period
+    avg_loss = loss / period
+    for i in range(period + 1, n):
+        avg_gain, avg_loss = rsi_step(avg_gain, avg_loss, closes[i] - closes[i - 1], period)
+    return avg_gain, avg_loss
+
+
+def rsi_from_avg(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
 def now_ms():
     return int(time.time() * 1000)
 
@@ -34,14 +78,14 @@ def sleep_s(seconds: int):
 
 
 def client_order_id(prefix: str) -> str:
-    base = f"{prefix}-{int(time.time()*1000)}-{random.randint(1000,9999)}"
-    h = hashlib.sha1(base.encode()).hexdigest()[:10]
-    return f"{prefix}-{h}"
+    return f"{prefix}-{secrets.token_hex(5)}"
 
 
-def round_step(value: float, step: float) -> float:
-    """Round value to the nearest exchange step size."""
-    return math.floor(value / step) * step
+def round_step(value, step: float):
+    """Round value (a float or an array) down to the exchange step size."""
+    # the epsilon keeps e.g. 0.3 / 0.1 == 2.999... from dropping a whole step
+    rounded = np.round(np.floor(value / step + 1e-9) * step, 12)
+    return rounded if isinstance(value, np.ndarray) else float(rounded)
 
 
 def pct(a: float, b: float) -> float: